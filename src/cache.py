@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+File-based response cache
+=========================
+Keyed on-disk cache for Kalshi API responses so repeated runs within a
+short window skip the network entirely. Entries are gzipped JSON files
+under .cache/, named by an MD5 of the URL plus sorted params, with a
+small header recording when they were written and when they go stale.
+"""
+
+import gzip
+import hashlib
+import orjson
+import time
+from pathlib import Path
+from typing import Optional
+
+# TTL policies in seconds, picked per endpoint
+TTL_SHORT = 10    # /markets — prices move fast
+TTL_NORMAL = 30   # default for everything else
+TTL_LONG = 300    # slow-moving metadata (events, series)
+
+
+def cache_key(url: str, params: dict) -> str:
+    """Build a stable cache key from a URL and its query params."""
+    canonical = url + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+    return hashlib.md5(canonical.encode()).hexdigest()
+
+
+def ttl_for(url: str) -> int:
+    """Pick a TTL policy based on the endpoint being hit."""
+    if url.rstrip("/").endswith("/markets"):
+        return TTL_SHORT
+    if "/events" in url or "/series" in url:
+        return TTL_LONG
+    return TTL_NORMAL
+
+
+class FileCache:
+    """Gzipped-JSON disk cache with per-entry TTL."""
+
+    def __init__(self, cache_dir: str = ".cache"):
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json.gz"
+
+    def get(self, key: str) -> Optional[tuple[dict, bool]]:
+        """
+        Look up a cached payload.
+
+        Returns:
+            (payload, fresh) where fresh is True if the entry is within
+            its TTL, or None if no entry exists or it cannot be read.
+        """
+        path = self._path(key)
+        if not path.exists():
+            return None
+
+        try:
+            with gzip.open(path, 'rb') as f:
+                entry = orjson.loads(f.read())
+            fresh = time.time() < entry["stale_at"]
+            return entry["payload"], fresh
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key: str, payload: dict, ttl: int = TTL_NORMAL):
+        """Write a payload with its freshness header."""
+        self.cache_dir.mkdir(exist_ok=True)
+        now = time.time()
+        entry = {
+            "generated_at": now,
+            "stale_at": now + ttl,
+            "payload": payload,
+        }
+        with gzip.open(self._path(key), 'wb') as f:
+            f.write(orjson.dumps(entry))